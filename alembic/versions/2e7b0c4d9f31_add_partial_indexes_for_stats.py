@@ -0,0 +1,38 @@
+"""add partial indexes for stats
+
+Revision ID: 2e7b0c4d9f31
+Revises: d1c93a5e0f68
+Create Date: 2026-10-15 14:10:18.447092
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e7b0c4d9f31'
+down_revision: Union[str, Sequence[str], None] = 'd1c93a5e0f68'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = {
+    'ix_products_low_stock': "ON products (product_id) WHERE stock_qty < 10",
+    'ix_users_active': "ON users (user_id) WHERE is_active",
+    'ix_orders_status': "ON orders (status)",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES.items():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,75 @@
+"""add unique cart item per product
+
+Revision ID: 3f9a1c7d2e84
+Revises: 00105e9ab6e8
+Create Date: 2026-10-15 09:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c7d2e84'
+down_revision: Union[str, Sequence[str], None] = '00105e9ab6e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 10_000
+
+# Merge and delete happen in one statement so an interrupted run never leaves
+# a summed row next to the duplicates it absorbed.
+MERGE_DUPLICATES_SQL = sa.text("""
+    WITH dup AS (
+        SELECT MIN(cart_item_id) AS keep_id, SUM(quantity) AS total_quantity
+        FROM cart_items
+        WHERE cart_id >= :lo AND cart_id < :hi
+        GROUP BY cart_id, product_id
+        HAVING COUNT(*) > 1
+    ), merged AS (
+        UPDATE cart_items
+        SET quantity = dup.total_quantity
+        FROM dup
+        WHERE cart_items.cart_item_id = dup.keep_id
+    )
+    DELETE FROM cart_items AS extra
+    USING dup, cart_items AS keep
+    WHERE keep.cart_item_id = dup.keep_id
+      AND extra.cart_id = keep.cart_id
+      AND extra.product_id = keep.product_id
+      AND extra.cart_item_id > dup.keep_id
+""")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fold any duplicate (cart_id, product_id) rows into the oldest one so the
+    # constraint can be created on existing data. Work in bounded cart_id
+    # ranges, each committed on its own, to keep lock time and WAL per
+    # transaction small on large tables.
+    min_cart_id, max_cart_id = op.get_bind().execute(
+        sa.text("SELECT MIN(cart_id), MAX(cart_id) FROM cart_items")
+    ).one()
+    if min_cart_id is not None:
+        for lo in range(min_cart_id, max_cart_id + 1, BACKFILL_BATCH_SIZE):
+            with op.get_context().autocommit_block():
+                op.execute(MERGE_DUPLICATES_SQL.bindparams(lo=lo, hi=lo + BACKFILL_BATCH_SIZE))
+
+    # Build the backing index without blocking writes, then attach it as the
+    # constraint, which only needs a brief lock and no table scan.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_cart_items_cart_product "
+            "ON cart_items (cart_id, product_id)"
+        )
+    op.execute(
+        "ALTER TABLE cart_items ADD CONSTRAINT uq_cart_items_cart_product "
+        "UNIQUE USING INDEX uq_cart_items_cart_product"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_cart_items_cart_product', 'cart_items', type_='unique')
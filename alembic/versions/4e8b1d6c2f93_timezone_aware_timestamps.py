@@ -0,0 +1,56 @@
+"""timezone aware timestamps
+
+Revision ID: 4e8b1d6c2f93
+Revises: 7c2b9e4f1a86
+Create Date: 2026-10-15 18:12:40.318527
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e8b1d6c2f93'
+down_revision: Union[str, Sequence[str], None] = '7c2b9e4f1a86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TIMESTAMP_COLUMNS = {
+    'users': ['created_at'],
+    'categories': ['created_at'],
+    'products': ['created_at'],
+    'orders': ['order_date', 'created_at'],
+    'order_items': ['created_at'],
+    'carts': ['created_at'],
+    'cart_items': ['created_at'],
+    'payments': ['created_at'],
+    'reviews': ['created_at'],
+    'shipping': ['estimated_delivery', 'delivered_at', 'created_at'],
+    'admins': ['created_at'],
+}
+
+
+def _alter(table: str, columns: list, type_: str) -> None:
+    # Stored values were written as UTC (utcnow, then now() on a UTC server).
+    # One ALTER TABLE per table so each is rewritten only once.
+    op.execute(
+        f"ALTER TABLE {table} "
+        + ", ".join(
+            f"ALTER COLUMN {column} TYPE {type_} USING {column} AT TIME ZONE 'UTC'"
+            for column in columns
+        )
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        _alter(table, columns, 'TIMESTAMP WITH TIME ZONE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, columns in TIMESTAMP_COLUMNS.items():
+        _alter(table, columns, 'TIMESTAMP WITHOUT TIME ZONE')
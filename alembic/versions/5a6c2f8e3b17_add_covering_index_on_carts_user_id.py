@@ -0,0 +1,35 @@
+"""add covering index on carts user_id
+
+Revision ID: 5a6c2f8e3b17
+Revises: e7a40b9c1d58
+Create Date: 2026-10-15 10:58:14.930276
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a6c2f8e3b17'
+down_revision: Union[str, Sequence[str], None] = 'e7a40b9c1d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Every column of carts is in the index, so cart-by-user lookups can be
+    # answered with an index-only scan.
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_carts_user_id "
+            "ON carts (user_id) INCLUDE (cart_id, created_at)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_carts_user_id")
@@ -0,0 +1,37 @@
+"""add products category product index
+
+Revision ID: 5d7f2a9c4b18
+Revises: 4e8b1d6c2f93
+Create Date: 2026-10-15 18:47:03.905216
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d7f2a9c4b18'
+down_revision: Union[str, Sequence[str], None] = '4e8b1d6c2f93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_category_id_product_id "
+            "ON products (category_id, product_id)"
+        )
+        # The composite index has category_id as its prefix, so it also
+        # covers everything the single-column index did.
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_products_category_id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_category_id ON products (category_id)")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_products_category_id_product_id")
@@ -0,0 +1,33 @@
+"""add orders user_id order_id index
+
+Revision ID: 6f0a8d3c5e92
+Revises: 2e7b0c4d9f31
+Create Date: 2026-10-15 15:21:33.908145
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f0a8d3c5e92'
+down_revision: Union[str, Sequence[str], None] = '2e7b0c4d9f31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_user_id_order_id "
+            "ON orders (user_id, order_id DESC)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_orders_user_id_order_id")
@@ -0,0 +1,38 @@
+"""generate order item subtotal
+
+Revision ID: 7c2b9e4f1a86
+Revises: a3d8e2f17c90
+Create Date: 2026-10-15 17:36:12.580414
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2b9e4f1a86'
+down_revision: Union[str, Sequence[str], None] = 'a3d8e2f17c90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # An existing column cannot be turned into a generated one, so subtotal is
+    # replaced. Both steps run in one ALTER TABLE, rewriting order_items once.
+    op.execute(
+        "ALTER TABLE order_items "
+        "DROP COLUMN subtotal, "
+        "ADD COLUMN subtotal NUMERIC(12, 2) GENERATED ALWAYS AS (quantity * unit_price) STORED"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute(
+        "ALTER TABLE order_items "
+        "ALTER COLUMN subtotal DROP EXPRESSION, "
+        "ALTER COLUMN subtotal SET NOT NULL"
+    )
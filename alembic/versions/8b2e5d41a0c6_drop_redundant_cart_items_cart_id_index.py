@@ -0,0 +1,32 @@
+"""drop redundant cart_items cart_id index
+
+Revision ID: 8b2e5d41a0c6
+Revises: 3f9a1c7d2e84
+Create Date: 2026-10-15 09:40:03.118562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e5d41a0c6'
+down_revision: Union[str, Sequence[str], None] = '3f9a1c7d2e84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # uq_cart_items_cart_product is backed by a (cart_id, product_id) b-tree,
+    # which already serves cart_id-only lookups as its leading column.
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_cart_items_cart_id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cart_items_cart_id ON cart_items (cart_id)")
@@ -0,0 +1,66 @@
+"""one cart per user
+
+Revision ID: 9d3f6a2b8c40
+Revises: 5a6c2f8e3b17
+Create Date: 2026-10-15 11:46:09.381540
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3f6a2b8c40'
+down_revision: Union[str, Sequence[str], None] = '5a6c2f8e3b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fold every user's extra carts into their oldest one, merging quantities
+    # for products present in both.
+    op.execute("""
+        CREATE TEMPORARY TABLE cart_merge ON COMMIT DROP AS
+        SELECT c.cart_id AS extra_id, keep.keep_id
+        FROM carts AS c
+        JOIN (
+            SELECT user_id, MIN(cart_id) AS keep_id
+            FROM carts
+            GROUP BY user_id
+            HAVING COUNT(*) > 1
+        ) AS keep ON keep.user_id = c.user_id
+        WHERE c.cart_id <> keep.keep_id
+    """)
+    op.execute("""
+        INSERT INTO cart_items (cart_id, product_id, quantity, created_at)
+        SELECT m.keep_id, ci.product_id, SUM(ci.quantity), MIN(ci.created_at)
+        FROM cart_items AS ci
+        JOIN cart_merge AS m ON m.extra_id = ci.cart_id
+        GROUP BY m.keep_id, ci.product_id
+        ON CONFLICT (cart_id, product_id)
+        DO UPDATE SET quantity = cart_items.quantity + EXCLUDED.quantity
+    """)
+    op.execute("DELETE FROM cart_items USING cart_merge WHERE cart_items.cart_id = cart_merge.extra_id")
+    op.execute("DELETE FROM carts USING cart_merge WHERE carts.cart_id = cart_merge.extra_id")
+
+    # Replace the covering index with a unique one of the same shape so
+    # get-or-create can rely on ON CONFLICT (user_id).
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_carts_user_id "
+            "ON carts (user_id) INCLUDE (cart_id, created_at)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_carts_user_id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_carts_user_id "
+            "ON carts (user_id) INCLUDE (cart_id, created_at)"
+        )
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS uq_carts_user_id")
@@ -0,0 +1,33 @@
+"""add active products partial index
+
+Revision ID: a3d8e2f17c90
+Revises: 6f0a8d3c5e92
+Create Date: 2026-10-15 16:02:47.215830
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3d8e2f17c90'
+down_revision: Union[str, Sequence[str], None] = '6f0a8d3c5e92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_active "
+            "ON products (product_id) WHERE is_active"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_products_active")
@@ -0,0 +1,39 @@
+"""add trigram indexes for product search
+
+Revision ID: b84e1f6d7a25
+Revises: 9d3f6a2b8c40
+Create Date: 2026-10-15 13:02:55.716384
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b84e1f6d7a25'
+down_revision: Union[str, Sequence[str], None] = '9d3f6a2b8c40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS products_name_trgm "
+            "ON products USING gin (name gin_trgm_ops)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS products_description_trgm "
+            "ON products USING gin (description gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS products_description_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS products_name_trgm")
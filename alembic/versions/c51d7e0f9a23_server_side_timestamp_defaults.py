@@ -0,0 +1,47 @@
+"""server side timestamp defaults
+
+Revision ID: c51d7e0f9a23
+Revises: 8b2e5d41a0c6
+Create Date: 2026-10-15 10:05:27.664091
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c51d7e0f9a23'
+down_revision: Union[str, Sequence[str], None] = '8b2e5d41a0c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TIMESTAMP_COLUMNS = [
+    ('users', 'created_at'),
+    ('categories', 'created_at'),
+    ('products', 'created_at'),
+    ('orders', 'order_date'),
+    ('orders', 'created_at'),
+    ('order_items', 'created_at'),
+    ('carts', 'created_at'),
+    ('cart_items', 'created_at'),
+    ('payments', 'created_at'),
+    ('reviews', 'created_at'),
+    ('shipping', 'created_at'),
+    ('admins', 'created_at'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SET DEFAULT only updates the catalog; existing rows are not rewritten.
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(table, column, server_default=sa.text('now()'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Most of these columns already defaulted to now() before this revision,
+    # and the application no longer sends timestamps, so keep the defaults.
+    pass
@@ -0,0 +1,41 @@
+"""add full text search to products
+
+Revision ID: d1c93a5e0f68
+Revises: b84e1f6d7a25
+Create Date: 2026-10-15 13:27:40.052917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1c93a5e0f68'
+down_revision: Union[str, Sequence[str], None] = 'b84e1f6d7a25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Adding a stored generated column rewrites products once.
+    op.add_column('products', sa.Column(
+        'search_tsv',
+        postgresql.TSVECTOR(),
+        sa.Computed("to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, ''))", persisted=True),
+        nullable=True,
+    ))
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS products_search_gin "
+            "ON products USING gin (search_tsv)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS products_search_gin")
+    op.drop_column('products', 'search_tsv')
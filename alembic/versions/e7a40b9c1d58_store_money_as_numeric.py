@@ -0,0 +1,46 @@
+"""store money as numeric
+
+Revision ID: e7a40b9c1d58
+Revises: c51d7e0f9a23
+Create Date: 2026-10-15 10:31:52.207415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a40b9c1d58'
+down_revision: Union[str, Sequence[str], None] = 'c51d7e0f9a23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONEY_COLUMNS = [
+    ('products', 'price'),
+    ('orders', 'total_amount'),
+    ('order_items', 'unit_price'),
+    ('order_items', 'subtotal'),
+    ('payments', 'amount'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Changing the type rewrites each table, so run this in a quiet window.
+    for table, column in MONEY_COLUMNS:
+        op.alter_column(table, column,
+                   existing_type=sa.Float(),
+                   type_=sa.Numeric(12, 2),
+                   existing_nullable=False,
+                   postgresql_using=f'round({column}::numeric, 2)')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in MONEY_COLUMNS:
+        op.alter_column(table, column,
+                   existing_type=sa.Numeric(12, 2),
+                   type_=sa.Float(),
+                   existing_nullable=False)
@@ -17,7 +17,10 @@ depends_on = None
 
 
 def upgrade():
-    # Rename existing tables and columns to match new structure
+    # Rename existing tables and columns to match new structure.
+    # RENAME COLUMN only touches the catalog: dependent foreign keys follow the
+    # column by attnum and are not re-validated, so there is no need to drop
+    # constraints or disable triggers around these renames.
     
     # Rename users table columns
     op.alter_column('users', 'id', new_column_name='user_id')
@@ -1,7 +1,10 @@
 """Cart-related functionality for the e-commerce platform."""
 
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from decimal import Decimal
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, selectinload
+from typing import Iterable, List, Optional
 from . import models, schemas
 
 def get_cart_by_user_id(db: Session, user_id: int) -> Optional[models.Cart]:
@@ -9,48 +12,75 @@ def get_cart_by_user_id(db: Session, user_id: int) -> Optional[models.Cart]:
     return db.query(models.Cart).filter(models.Cart.user_id == user_id).first()
 
 def create_cart(db: Session, user_id: int) -> models.Cart:
-    """Create a new cart for a user."""
-    db_cart = models.Cart(user_id=user_id)
-    db.add(db_cart)
+    """Create a cart for a user, or return theirs if one appeared concurrently."""
+    stmt = insert(models.Cart).values(user_id=user_id).on_conflict_do_nothing(
+        index_elements=[models.Cart.user_id]
+    ).returning(models.Cart)
+    db_cart = db.scalars(stmt).first()
     db.commit()
-    db.refresh(db_cart)
+    if db_cart is None:
+        # Another request created the cart between our lookup and insert.
+        db_cart = get_cart_by_user_id(db, user_id)
     return db_cart
 
+def _cached_cart(db: Session, user_id: int) -> Optional[models.Cart]:
+    """Return the cart already resolved for this user in the current session."""
+    return db.info.setdefault("cart_cache", {}).get(user_id)
+
 def get_or_create_cart(db: Session, user_id: int) -> models.Cart:
     """Get existing cart or create new one for user."""
-    cart = get_cart_by_user_id(db, user_id)
-    if not cart:
-        cart = create_cart(db, user_id)
+    cart = _cached_cart(db, user_id)
+    if cart is None:
+        cart = get_cart_by_user_id(db, user_id)
+        if not cart:
+            cart = create_cart(db, user_id)
+        db.info["cart_cache"][user_id] = cart
     return cart
 
 def add_item_to_cart(db: Session, cart_item: schemas.CartItemCreate) -> models.CartItem:
-    """Add an item to the cart."""
-    # Get or create cart
-    cart = get_or_create_cart(db, cart_item.cart_id)
-    
-    # Check if item already exists in cart
-    existing_item = db.query(models.CartItem).filter(
-        models.CartItem.cart_id == cart.id,
-        models.CartItem.product_id == cart_item.product_id
-    ).first()
-    
-    if existing_item:
-        # Update quantity
-        existing_item.quantity += cart_item.quantity
-        db.commit()
-        db.refresh(existing_item)
-        return existing_item
-    else:
-        # Create new cart item
-        db_cart_item = models.CartItem(
-            cart_id=cart.id,
-            product_id=cart_item.product_id,
-            quantity=cart_item.quantity
-        )
-        db.add(db_cart_item)
-        db.commit()
-        db.refresh(db_cart_item)
-        return db_cart_item
+    """Add an item to the cart, or bump its quantity if it is already there."""
+    # There is no read before the write: the conflicting row is locked only for
+    # the duration of this statement, so concurrent adds never wait on a
+    # SELECT ... FOR UPDATE held across round trips.
+    stmt = insert(models.CartItem).values(
+        cart_id=cart_item.cart_id,
+        product_id=cart_item.product_id,
+        quantity=cart_item.quantity
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.CartItem.cart_id, models.CartItem.product_id],
+        set_={"quantity": models.CartItem.quantity + stmt.excluded.quantity}
+    ).returning(models.CartItem)
+
+    db_cart_item = db.scalars(stmt, execution_options={"populate_existing": True}).one()
+    db.commit()
+    return db_cart_item
+
+def add_items_to_cart(db: Session, cart_items: List[schemas.CartItemCreate]) -> List[models.CartItem]:
+    """Add several items to carts in a single upsert and commit."""
+    if not cart_items:
+        return []
+
+    # ON CONFLICT cannot touch the same row twice in one statement, so merge
+    # repeated (cart_id, product_id) pairs before sending them.
+    quantities = {}
+    for item in cart_items:
+        key = (item.cart_id, item.product_id)
+        quantities[key] = quantities.get(key, 0) + item.quantity
+    rows = [
+        {"cart_id": cart_id, "product_id": product_id, "quantity": quantity}
+        for (cart_id, product_id), quantity in quantities.items()
+    ]
+
+    stmt = insert(models.CartItem).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.CartItem.cart_id, models.CartItem.product_id],
+        set_={"quantity": models.CartItem.quantity + stmt.excluded.quantity}
+    ).returning(models.CartItem)
+
+    db_cart_items = db.scalars(stmt, execution_options={"populate_existing": True}).all()
+    db.commit()
+    return db_cart_items
 
 def remove_item_from_cart(db: Session, cart_id: int, product_id: int) -> bool:
     """Remove an item from the cart."""
@@ -75,27 +105,30 @@ def update_cart_item_quantity(db: Session, cart_id: int, product_id: int, quanti
     if cart_item:
         cart_item.quantity = quantity
         db.commit()
-        db.refresh(cart_item)
         return cart_item
     return None
 
-def get_cart_items(db: Session, cart_id: int) -> List[models.CartItem]:
-    """Get all items in a cart."""
-    return db.query(models.CartItem).filter(models.CartItem.cart_id == cart_id).all()
+def get_cart_items(db: Session, cart_id: int) -> Iterable[models.CartItem]:
+    """Stream the items in a cart, with their products loaded per batch."""
+    return db.query(models.CartItem).options(
+        selectinload(models.CartItem.product)
+    ).filter(models.CartItem.cart_id == cart_id).yield_per(500)
 
 def clear_cart(db: Session, cart_id: int) -> bool:
     """Clear all items from a cart."""
-    cart_items = db.query(models.CartItem).filter(models.CartItem.cart_id == cart_id).all()
-    for item in cart_items:
-        db.delete(item)
+    db.query(models.CartItem).filter(
+        models.CartItem.cart_id == cart_id
+    ).delete(synchronize_session=False)
     db.commit()
     return True
 
-def get_cart_total(db: Session, cart_id: int) -> float:
+def get_cart_total(db: Session, cart_id: int) -> Decimal:
     """Calculate the total value of items in the cart."""
-    cart_items = get_cart_items(db, cart_id)
-    total = 0.0
-    for item in cart_items:
-        if item.product:
-            total += item.product.price * item.quantity
-    return total
+    cart_items = models.CartItem.__table__
+    products = models.Product.__table__
+    stmt = select(
+        func.coalesce(func.sum(cart_items.c.quantity * products.c.price), 0)
+    ).select_from(
+        cart_items.join(products, products.c.product_id == cart_items.c.product_id)
+    ).where(cart_items.c.cart_id == cart_id)
+    return db.execute(stmt).scalar()
@@ -1,39 +1,128 @@
 """CRUD operations for the e-commerce platform."""
 
-import email
+import base64
+import hashlib
+import hmac
+import os
+import bcrypt
+from functools import lru_cache
+from threading import Lock
+from cachetools import TTLCache, cached
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from typing import List, Optional
-from passlib.context import CryptContext
+from sqlalchemy import bindparam, exists, func, literal, or_, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.dialects.postgresql import insert
+from typing import Dict, Iterable, Iterator, List, Optional
 from . import models, schemas
+from .cart import add_items_to_cart
 
-# Password hashing - using only pbkdf2_sha256 to avoid bcrypt issues
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# Password hashing - bcrypt called directly; the cost factor can be raised
+# through the environment as hardware gets faster.
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))
+BCRYPT_MAX_PASSWORD_BYTES = schemas.MAX_PASSWORD_BYTES
 
 def get_password_hash(password: str) -> str:
-    """Hash a password using pbkdf2_sha256 (no length limitations)."""
-    return pwd_context.hash(password, scheme="pbkdf2_sha256")
+    """Hash a password using bcrypt (at most 72 bytes)."""
+    password_bytes = password.encode()
+    # The request schemas already enforce this; keep it as a backstop.
+    if len(password_bytes) > BCRYPT_MAX_PASSWORD_BYTES:
+        raise ValueError("Password must be at most 72 bytes long")
+    return bcrypt.hashpw(password_bytes, bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+
+def _ab64_decode(data: str) -> bytes:
+    """Decode passlib's adapted base64 (``.`` for ``+``, no padding)."""
+    return base64.b64decode(data.replace(".", "+") + "=" * (-len(data) % 4))
+
+def _verify_legacy_pbkdf2_sha256(plain_password: str, hashed_password: str) -> bool:
+    """Verify a ``$pbkdf2-sha256$rounds$salt$checksum`` hash written by passlib."""
+    _, _, rounds, salt, checksum = hashed_password.split("$")
+    expected = _ab64_decode(checksum)
+    actual = hashlib.pbkdf2_hmac(
+        "sha256", plain_password.encode(), _ab64_decode(salt), int(rounds), dklen=len(expected)
+    )
+    return hmac.compare_digest(actual, expected)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password using pbkdf2_sha256."""
+    """Verify a password against a bcrypt or legacy pbkdf2_sha256 hash."""
     try:
-        return pwd_context.verify(plain_password, hashed_password)
+        if hashed_password.startswith("$pbkdf2-sha256$"):
+            return _verify_legacy_pbkdf2_sha256(plain_password, hashed_password)
+        return bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
     except Exception:
         # If verification fails, return False
         return False
 
+@lru_cache(maxsize=1)
+def _dummy_password_hash() -> bytes:
+    return bcrypt.hashpw(b"dummy-password", bcrypt.gensalt(rounds=BCRYPT_ROUNDS))
+
+def burn_password_check(plain_password: str) -> bool:
+    """Spend the same bcrypt time as a real check, then fail.
+
+    Login calls this when the account does not exist, so response time does
+    not reveal which emails or usernames are registered.
+    """
+    bcrypt.checkpw(plain_password.encode()[:BCRYPT_MAX_PASSWORD_BYTES], _dummy_password_hash())
+    return False
+
+# Column sets for read-only listings. These are selected as plain rows, which
+# Pydantic reads by attribute, so no ORM instances are built for them.
+USER_LIST_COLUMNS = (
+    models.User.user_id, models.User.name, models.User.email, models.User.phone,
+    models.User.address, models.User.created_at, models.User.is_active,
+)
+PRODUCT_LIST_COLUMNS = (
+    models.Product.product_id, models.Product.name, models.Product.description,
+    models.Product.price, models.Product.stock_qty, models.Product.category_id,
+    models.Product.brand, models.Product.created_at, models.Product.is_active,
+)
+ORDER_LIST_COLUMNS = (
+    models.Order.order_id, models.Order.user_id, models.Order.order_date, models.Order.status,
+    models.Order.total_amount, models.Order.shipping_address, models.Order.created_at,
+)
+CATEGORY_LIST_COLUMNS = (
+    models.Category.category_id, models.Category.category_name,
+    models.Category.description, models.Category.created_at,
+)
+CART_ITEM_LIST_COLUMNS = (
+    models.CartItem.cart_item_id, models.CartItem.cart_id, models.CartItem.product_id,
+    models.CartItem.quantity, models.CartItem.created_at,
+)
+
+# Results that are consumed row by row (the streamed product listing) are
+# read through a server-side cursor, so neither libpq nor the driver holds
+# the whole result set at once. Bounded pages are fetched in one go.
+STREAM_YIELD_PER = 500
+
+def _iter_rows(db: Session, query) -> Iterator[Row]:
+    """Yield the rows of ``query``, fetched in ``STREAM_YIELD_PER`` batches."""
+    result = db.execute(query.execution_options(stream_results=True, yield_per=STREAM_YIELD_PER))
+    for partition in result.partitions():
+        yield from partition
+
 # User CRUD operations
 def get_user(db: Session, user_id: int) -> Optional[models.User]:
     """Get a user by ID."""
     return db.query(models.User).filter(models.User.user_id == user_id).first()
 
+# Built once so every login reuses the same statement object and its cached
+# compiled form.
+USER_BY_EMAIL_STMT = select(models.User).where(models.User.email == bindparam("email"))
+
 def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
     """Get a user by email."""
-    return db.query(models.User).filter(models.User.email == email).first()
+    return db.execute(USER_BY_EMAIL_STMT, {"email": email}).scalar_one_or_none()
 
-def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[models.User]:
-    """Get all users with pagination."""
-    return db.query(models.User).offset(skip).limit(limit).all()
+def get_users(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List[Row]:
+    """Get all users with pagination, in user_id order.
+
+    Pass the last ``user_id`` of the previous page as ``after_id`` to page
+    by key instead of by offset.
+    """
+    query = select(*USER_LIST_COLUMNS)
+    if after_id is not None:
+        query = query.where(models.User.user_id > after_id)
+    return db.execute(query.order_by(models.User.user_id).offset(skip).limit(limit)).all()
 
 def create_user(db: Session, user: schemas.UserCreate) -> models.User:
     """Create a new user."""
@@ -55,10 +144,55 @@ def get_admin(db: Session, admin_id: int) -> Optional[models.Admin]:
     return db.query(models.Admin).filter(models.Admin.admin_id == admin_id).first()
 
 
+# Admin auth runs on every admin request but only needs these columns, and
+# they change rarely. Entries live for a minute per worker process;
+# update_admin and delete_admin evict the entry in this one. Misses are not
+# cached, so an admin created in another worker can sign in straight away.
+ADMIN_AUTH_COLUMNS = (models.Admin.admin_id, models.Admin.role, models.Admin.is_active)
+_admin_auth_cache = TTLCache(maxsize=1024, ttl=60)
+_admin_auth_lock = Lock()
+
+
+def peek_admin_auth(admin_id: int) -> Optional[Row]:
+    """Return the cached auth row for an admin without touching the database."""
+    with _admin_auth_lock:
+        return _admin_auth_cache.get(admin_id)
+
+
+def get_admin_auth(db: Session, admin_id: int) -> Optional[Row]:
+    """Get the id, role and active flag of an admin, cached."""
+    row = peek_admin_auth(admin_id)
+    if row is None:
+        row = db.execute(
+            select(*ADMIN_AUTH_COLUMNS).where(models.Admin.admin_id == admin_id)
+        ).first()
+        if row is not None:
+            with _admin_auth_lock:
+                _admin_auth_cache[admin_id] = row
+    return row
+
+
+def _forget_admin_auth(admin_id: int) -> None:
+    with _admin_auth_lock:
+        _admin_auth_cache.pop(admin_id, None)
+
+
 def get_admin_by_username(db: Session, username: str) -> Optional[models.Admin]:
     return db.query(models.Admin).filter(models.Admin.email == username).first()
 
 
+def get_admin_conflict(db: Session, username: str, email: str) -> Optional[str]:
+    """Return "username" or "email" if an existing admin already uses it."""
+    username_taken = db.execute(
+        select(models.Admin.username == username)
+        .where(or_(models.Admin.username == username, models.Admin.email == email))
+        .limit(1)
+    ).scalar()
+    if username_taken is None:
+        return None
+    return "username" if username_taken else "email"
+
+
 def get_admin_by_user_id(db: Session, user_id: int) -> Optional[models.Admin]:
     # For now, we'll use a simple mapping. In production, you'd have a proper user-admin relationship
     # This is a temporary solution - in real implementation, you'd have a user_id field in Admin model
@@ -94,6 +228,7 @@ def update_admin(db: Session, admin_id: int, admin_update: schemas.AdminUpdate)
     for field, value in update_data.items():
         setattr(db_admin, field, value)
     db.commit()
+    _forget_admin_auth(admin_id)
     db.refresh(db_admin)
     return db_admin
 
@@ -104,37 +239,40 @@ def delete_admin(db: Session, admin_id: int) -> Optional[models.Admin]:
         return None
     db_admin.is_active = False
     db.commit()
+    _forget_admin_auth(admin_id)
     db.refresh(db_admin)
     return db_admin
 
+def _update_user_returning(db: Session, user_id: int, values: dict) -> Optional[models.User]:
+    """Apply ``values`` to a user with one UPDATE ... RETURNING and commit."""
+    stmt = update(models.User).where(models.User.user_id == user_id).values(**values).returning(models.User)
+    db_user = db.scalars(stmt, execution_options={"populate_existing": True}).one_or_none()
+    db.commit()
+    return db_user
+
+def set_user_active(db: Session, user_id: int, is_active: bool) -> Optional[models.User]:
+    """Activate or deactivate a user."""
+    return _update_user_returning(db, user_id, {"is_active": is_active})
+
 def update_user(db: Session, user_id: int, user_update: schemas.UserUpdate) -> Optional[models.User]:
     """Update a user."""
-    db_user = db.query(models.User).filter(models.User.user_id == user_id).first()
-    if db_user:
-        update_data = user_update.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(db_user, field, value)
-        db.commit()
-        db.refresh(db_user)
-    return db_user
+    update_data = user_update.dict(exclude_unset=True)
+    if not update_data:
+        return get_user(db, user_id)
+    return _update_user_returning(db, user_id, update_data)
 
 def delete_user(db: Session, user_id: int) -> Optional[models.User]:
     """Delete a user (soft delete)."""
-    db_user = db.query(models.User).filter(models.User.user_id == user_id).first()
-    if db_user:
-        db_user.is_active = False
-        db.commit()
-        db.refresh(db_user)
-    return db_user
+    return _update_user_returning(db, user_id, {"is_active": False})
 
 # Category CRUD operations
 def get_category(db: Session, category_id: int) -> Optional[models.Category]:
     """Get a category by ID."""
     return db.query(models.Category).filter(models.Category.category_id == category_id).first()
 
-def get_categories(db: Session, skip: int = 0, limit: int = 100) -> List[models.Category]:
+def get_categories(db: Session, skip: int = 0, limit: int = 100) -> List[Row]:
     """Get all categories."""
-    return db.query(models.Category).offset(skip).limit(limit).all()
+    return db.execute(select(*CATEGORY_LIST_COLUMNS).offset(skip).limit(limit)).all()
 
 def create_category(db: Session, category: schemas.CategoryCreate) -> models.Category:
     """Create a new category."""
@@ -149,21 +287,51 @@ def get_product(db: Session, product_id: int) -> Optional[models.Product]:
     """Get a product by ID."""
     return db.query(models.Product).filter(models.Product.product_id == product_id).first()
 
-def get_products(db: Session, skip: int = 0, limit: int = 100, category_id: Optional[int] = None) -> List[models.Product]:
-    """Get all products with optional category filter."""
-    query = db.query(models.Product)
+def _products_query(skip: int, limit: int, category_id: Optional[int], after_id: Optional[int]):
+    query = select(*PRODUCT_LIST_COLUMNS)
     if category_id:
-        query = query.filter(models.Product.category_id == category_id)
-    return query.offset(skip).limit(limit).all()
-
-def search_products(db: Session, search_term: str, skip: int = 0, limit: int = 100) -> List[models.Product]:
+        query = query.where(models.Product.category_id == category_id)
+    if after_id is not None:
+        query = query.where(models.Product.product_id > after_id)
+    return query.order_by(models.Product.product_id).offset(skip).limit(limit)
+
+def get_products(db: Session, skip: int = 0, limit: int = 100, category_id: Optional[int] = None, after_id: Optional[int] = None) -> List[Row]:
+    """Get all products with optional category filter, in product_id order.
+
+    Pass the last ``product_id`` of the previous page as ``after_id`` to
+    page by key instead of by offset.
+    """
+    return db.execute(_products_query(skip, limit, category_id, after_id)).all()
+
+def iter_products(db: Session, skip: int = 0, limit: int = 100, category_id: Optional[int] = None, after_id: Optional[int] = None) -> Iterator[Row]:
+    """Like get_products, but yield rows as they arrive from the cursor."""
+    return _iter_rows(db, _products_query(skip, limit, category_id, after_id))
+
+def get_products_by_ids(db: Session, product_ids: Iterable[int]) -> Dict[int, Row]:
+    """Fetch (product_id, stock_qty, is_active) for many products in one query."""
+    rows = db.execute(
+        select(models.Product.product_id, models.Product.stock_qty, models.Product.is_active)
+        .where(models.Product.product_id.in_(set(product_ids)))
+    ).all()
+    return {row.product_id: row for row in rows}
+
+def search_products(db: Session, search_term: str, skip: int = 0, limit: int = 100) -> List[Row]:
     """Search products by name or description."""
-    return db.query(models.Product).filter(
-        or_(
-            models.Product.name.ilike(f"%{search_term}%"),
-            models.Product.description.ilike(f"%{search_term}%")
+    query = select(*PRODUCT_LIST_COLUMNS)
+    if " " in search_term.strip():
+        # Multi-word queries match whole words via the full-text index.
+        query = query.where(
+            models.Product.search_tsv.op("@@")(func.plainto_tsquery("english", search_term))
+        )
+    else:
+        # Single terms match substrings via the trigram indexes.
+        query = query.where(
+            or_(
+                models.Product.name.ilike(f"%{search_term}%"),
+                models.Product.description.ilike(f"%{search_term}%")
+            )
         )
-    ).offset(skip).limit(limit).all()
+    return db.execute(query.offset(skip).limit(limit)).all()
 
 def create_product(db: Session, product: schemas.ProductCreate) -> models.Product:
     """Create a new product."""
@@ -173,6 +341,18 @@ def create_product(db: Session, product: schemas.ProductCreate) -> models.Produc
     db.refresh(db_product)
     return db_product
 
+def set_product_price(db: Session, product_id: int, price) -> Optional[models.Product]:
+    """Set a product's price with one UPDATE ... RETURNING and commit."""
+    stmt = (
+        update(models.Product)
+        .where(models.Product.product_id == product_id)
+        .values(price=price)
+        .returning(models.Product)
+    )
+    db_product = db.scalars(stmt, execution_options={"populate_existing": True}).one_or_none()
+    db.commit()
+    return db_product
+
 def update_product(db: Session, product_id: int, product_update: schemas.ProductUpdate) -> Optional[models.Product]:
     """Update a product."""
     db_product = get_product(db, product_id)
@@ -219,12 +399,14 @@ def delete_product(db: Session, product_id: int) -> bool:
     return True
 
 
-def delete_user(db: Session, user_id: int) -> bool:
+def hard_delete_user(db: Session, user_id: int) -> bool:
     user = get_user(db, user_id)
     if not user:
         return False
     db.delete(user)
     db.commit()
+    with _user_carts_lock:
+        _user_carts.pop(user_id, None)
     return True
 
 
@@ -253,50 +435,115 @@ def get_or_create_cart(db: Session, user_id: int) -> models.Cart:
     """Get existing cart or create new one for user."""
     cart = get_cart_by_user(db, user_id)
     if not cart:
-        cart = models.Cart(user_id=user_id)
-        db.add(cart)
+        stmt = insert(models.Cart).values(user_id=user_id).on_conflict_do_nothing(
+            index_elements=[models.Cart.user_id]
+        ).returning(models.Cart)
+        cart = db.scalars(stmt).first()
         db.commit()
-        db.refresh(cart)
+        if cart is None:
+            # Another request created the cart between our lookup and insert.
+            cart = get_cart_by_user(db, user_id)
     return cart
 
-def add_to_cart(db: Session, cart_item: schemas.CartItemCreate) -> models.CartItem:
-    """Add an item to cart."""
-    # Check if item already exists in cart
-    existing_item = db.query(models.CartItem).filter(
-        models.CartItem.cart_id == cart_item.cart_id,
-        models.CartItem.product_id == cart_item.product_id
-    ).first()
-    
-    if existing_item:
-        # Update quantity
-        existing_item.quantity += cart_item.quantity
-        db.commit()
-        db.refresh(existing_item)
-        return existing_item
+# A user's cart row never changes once created (one cart per user, items live
+# in cart_items), so the resolved cart is kept per worker for 30 seconds.
+# hard_delete_user evicts it in its own worker; the short TTL bounds how long
+# other workers can still return the deleted cart.
+_user_carts = TTLCache(maxsize=100_000, ttl=30)
+_user_carts_lock = Lock()
+
+@cached(_user_carts, key=lambda db, user_id: user_id, lock=_user_carts_lock)
+def get_user_cart(db: Session, user_id: int) -> schemas.Cart:
+    """Get or create the user's cart, cached by user ID."""
+    return schemas.Cart.model_validate(get_or_create_cart(db, user_id))
+
+def _values_if(values: dict, *conditions):
+    """SELECT the given values as one row, but only when ``conditions`` hold.
+
+    Used as the source of ``INSERT ... SELECT`` so an ownership check and the
+    insert run as a single statement.
+    """
+    return select(*(literal(value) for value in values.values())).where(exists().where(*conditions))
+
+def add_to_cart(db: Session, cart_item: schemas.CartItemCreate, user_id: Optional[int] = None) -> Optional[models.CartItem]:
+    """Add an item to cart, or bump its quantity if it is already there.
+
+    With ``user_id`` the cart must belong to that user; otherwise nothing is
+    written and None is returned.
+    """
+    values = cart_item.dict()
+    if user_id is None:
+        stmt = insert(models.CartItem).values(**values)
     else:
-        # Create new cart item
-        db_cart_item = models.CartItem(**cart_item.dict())
-        db.add(db_cart_item)
-        db.commit()
-        db.refresh(db_cart_item)
-        return db_cart_item
+        stmt = insert(models.CartItem).from_select(list(values), _values_if(
+            values, models.Cart.cart_id == cart_item.cart_id, models.Cart.user_id == user_id
+        ))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.CartItem.cart_id, models.CartItem.product_id],
+        set_={"quantity": models.CartItem.quantity + stmt.excluded.quantity}
+    ).returning(models.CartItem)
+    db_cart_item = db.scalars(stmt, execution_options={"populate_existing": True}).one_or_none()
+    db.commit()
+    return db_cart_item
+
+def add_to_cart_bulk(db: Session, cart_items: List[schemas.CartItemCreate], user_id: int) -> Optional[List[models.CartItem]]:
+    """Add several items in one multi-row upsert and a single commit.
+
+    Returns None, writing nothing, unless every cart belongs to ``user_id``.
+    """
+    if not cart_items:
+        return []
+    cart_ids = {item.cart_id for item in cart_items}
+    owned = db.execute(
+        select(func.count()).select_from(models.Cart)
+        .where(models.Cart.cart_id.in_(cart_ids), models.Cart.user_id == user_id)
+    ).scalar()
+    if owned != len(cart_ids):
+        return None
 
-def get_cart_items(db: Session, cart_id: int) -> List[models.CartItem]:
-    """Get all items in a cart."""
-    return db.query(models.CartItem).filter(models.CartItem.cart_id == cart_id).all()
+    return add_items_to_cart(db, cart_items)
+
+def get_cart_items(db: Session, cart_id: int, user_id: Optional[int] = None) -> Optional[List[Row]]:
+    """Get all items in a cart.
+
+    With ``user_id`` the cart is joined in the same query and None is
+    returned when it does not belong to that user.
+    """
+    if user_id is None:
+        return db.execute(
+            select(*CART_ITEM_LIST_COLUMNS).where(models.CartItem.cart_id == cart_id)
+        ).all()
+    rows = db.execute(
+        select(models.Cart.cart_id.label("owned_cart_id"), *CART_ITEM_LIST_COLUMNS)
+        .outerjoin(models.CartItem, models.CartItem.cart_id == models.Cart.cart_id)
+        .where(models.Cart.cart_id == cart_id, models.Cart.user_id == user_id)
+    ).all()
+    if not rows:
+        return None
+    # An owned but empty cart comes back as one row of NULL item columns.
+    return [row for row in rows if row.cart_item_id is not None]
 
 # Order CRUD operations
 def get_order(db: Session, order_id: int) -> Optional[models.Order]:
     """Get an order by ID."""
     return db.query(models.Order).filter(models.Order.order_id == order_id).first()
 
-def get_orders(db: Session, skip: int = 0, limit: int = 100) -> List[models.Order]:
+def get_orders(db: Session, skip: int = 0, limit: int = 100) -> List[Row]:
     """Get all orders."""
-    return db.query(models.Order).offset(skip).limit(limit).all()
+    return db.execute(select(*ORDER_LIST_COLUMNS).offset(skip).limit(limit)).all()
+
+def get_orders_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100, before_id: Optional[int] = None) -> List[Row]:
+    """Get orders by user ID, newest first.
 
-def get_orders_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[models.Order]:
-    """Get orders by user ID."""
-    return db.query(models.Order).filter(models.Order.user_id == user_id).offset(skip).limit(limit).all()
+    Pass the last ``order_id`` of the previous page as ``before_id`` to page
+    by key instead of by offset.
+    """
+    query = select(*ORDER_LIST_COLUMNS).where(models.Order.user_id == user_id)
+    if before_id is not None:
+        query = query.where(models.Order.order_id < before_id)
+    return db.execute(
+        query.order_by(models.Order.order_id.desc()).offset(skip).limit(limit)
+    ).all()
 
 def create_order(db: Session, order: schemas.OrderCreate) -> models.Order:
     """Create a new order."""
@@ -307,17 +554,54 @@ def create_order(db: Session, order: schemas.OrderCreate) -> models.Order:
     return db_order
 
 # OrderItem CRUD operations
-def create_order_item(db: Session, order_item: schemas.OrderItemCreate) -> models.OrderItem:
-    """Create a new order item."""
-    db_order_item = models.OrderItem(**order_item.dict())
-    db.add(db_order_item)
+def create_order_item(db: Session, order_item: schemas.OrderItemCreate, user_id: Optional[int] = None) -> Optional[models.OrderItem]:
+    """Create a new order item.
+
+    With ``user_id`` the order must belong to that user; otherwise nothing is
+    written and None is returned.
+    """
+    if user_id is None:
+        db_order_item = models.OrderItem(**order_item.dict())
+        db.add(db_order_item)
+        db.commit()
+        db.refresh(db_order_item)
+        return db_order_item
+    values = order_item.dict()
+    db_order_item = db.scalars(
+        insert(models.OrderItem).from_select(list(values), _values_if(
+            values, models.Order.order_id == order_item.order_id, models.Order.user_id == user_id
+        )).returning(models.OrderItem)
+    ).one_or_none()
     db.commit()
-    db.refresh(db_order_item)
     return db_order_item
 
-def get_order_items(db: Session, order_id: int) -> List[models.OrderItem]:
-    """Get all items in an order."""
-    return db.query(models.OrderItem).filter(models.OrderItem.order_id == order_id).all()
+def create_order_items_bulk(db: Session, order_items: List[schemas.OrderItemCreate]) -> List[models.OrderItem]:
+    """Create many order items in one batched INSERT and a single commit."""
+    if not order_items:
+        return []
+    db_order_items = db.scalars(
+        insert(models.OrderItem).returning(models.OrderItem),
+        [order_item.dict() for order_item in order_items]
+    ).all()
+    db.commit()
+    return db_order_items
+
+def get_order_items(db: Session, order_id: int, user_id: Optional[int] = None) -> Optional[List[models.OrderItem]]:
+    """Get all items in an order.
+
+    With ``user_id`` the order is joined in the same query and None is
+    returned when it does not belong to that user.
+    """
+    if user_id is None:
+        return db.query(models.OrderItem).filter(models.OrderItem.order_id == order_id).all()
+    rows = db.execute(
+        select(models.Order.order_id, models.OrderItem)
+        .outerjoin(models.OrderItem, models.OrderItem.order_id == models.Order.order_id)
+        .where(models.Order.order_id == order_id, models.Order.user_id == user_id)
+    ).all()
+    if not rows:
+        return None
+    return [order_item for _, order_item in rows if order_item is not None]
 
 # Payment CRUD operations
 def get_payment(db: Session, payment_id: int) -> Optional[models.Payment]:
@@ -360,4 +644,41 @@ def create_shipping(db: Session, shipping: schemas.ShippingCreate) -> models.Shi
     db.add(db_shipping)
     db.commit()
     db.refresh(db_shipping)
-    return db_shipping
\ No newline at end of file
+    return db_shipping
+# Statistics - each returns all of its counts from a single scan. Dashboards
+# poll these, so each result is reused for five seconds per worker; that is
+# the only caching in front of them, so counts are at most five seconds old.
+_stats_cache = TTLCache(maxsize=8, ttl=5)
+_stats_lock = Lock()
+
+@cached(_stats_cache, key=lambda db: "products", lock=_stats_lock)
+def get_product_stats(db: Session) -> Row:
+    """Count all, active and low-stock products."""
+    return db.execute(
+        select(
+            func.count().label("total_products"),
+            func.count().filter(models.Product.is_active == True).label("active_products"),
+            func.count().filter(models.Product.stock_qty < 10).label("low_stock_products"),
+        ).select_from(models.Product)
+    ).one()
+
+@cached(_stats_cache, key=lambda db: "users", lock=_stats_lock)
+def get_user_stats(db: Session) -> Row:
+    """Count all and active users."""
+    return db.execute(
+        select(
+            func.count().label("total_users"),
+            func.count().filter(models.User.is_active == True).label("active_users"),
+        ).select_from(models.User)
+    ).one()
+
+@cached(_stats_cache, key=lambda db: "orders", lock=_stats_lock)
+def get_order_stats(db: Session) -> Row:
+    """Count all, pending and completed orders."""
+    return db.execute(
+        select(
+            func.count().label("total_orders"),
+            func.count().filter(models.Order.status == "pending").label("pending_orders"),
+            func.count().filter(models.Order.status == "completed").label("completed_orders"),
+        ).select_from(models.Order)
+    ).one()
@@ -1,106 +1,197 @@
 """FastAPI E-Commerce Platform Application."""
 
 from fastapi import FastAPI, Depends, HTTPException, status, Header, Request
-from fastapi.responses import JSONResponse
+from anyio import to_thread
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import logging
+import os
+import time
 import jwt
-from datetime import datetime, timedelta
-from pydantic import BaseModel
+from cachetools import TTLCache
+from threading import Lock
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from pydantic import BaseModel, TypeAdapter
 
 
-from . import crud, models, schemas
-from .database import get_db
+from . import crud, schemas
+from .database import MAX_OVERFLOW, POOL_SIZE, SessionLocal, get_db, warm_pool
+from .responses import HEALTH_BODY, ROOT_BODY, json_list_response
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Simple auth configuration (temporary for testing)
-SECRET_KEY = "your-secret-key-change-in-production"
+# List endpoints validate rows and write JSON bytes through these adapters,
+# built once here, instead of going through FastAPI's response_model
+# coercion on each request. response_model is kept for the OpenAPI schema.
+USER_LIST_ADAPTER = TypeAdapter(List[schemas.User])
+ORDER_LIST_ADAPTER = TypeAdapter(List[schemas.Order])
+CATEGORY_LIST_ADAPTER = TypeAdapter(List[schemas.Category])
+REVIEW_LIST_ADAPTER = TypeAdapter(List[schemas.Review])
+
+# Public catalog reads are served from rendered JSON for up to 30 seconds.
+# Product, category and review writes in this process clear it; other
+# workers catch up when their entries expire. Callers choose the keys
+# (skip, limit, after_id, ...), so the cache is bounded by the bytes it
+# holds rather than by entry count.
+RESPONSE_CACHE_BYTES = 32 * 1024 * 1024
+PRODUCT_ADAPTER = TypeAdapter(schemas.Product)
+PRODUCT_LIST_ADAPTER = TypeAdapter(List[schemas.Product])
+CATEGORY_ADAPTER = TypeAdapter(schemas.Category)
+_response_cache = TTLCache(maxsize=RESPONSE_CACHE_BYTES, ttl=30, getsizeof=len)
+_response_cache_lock = Lock()
+
+def cached_json_response(key: tuple, adapter: TypeAdapter, load) -> Response:
+    """Return the cached body for ``key``, or render ``load()`` and cache it."""
+    with _response_cache_lock:
+        body = _response_cache.get(key)
+    if body is None:
+        body = adapter.dump_json(adapter.validate_python(load()))
+        if len(body) <= RESPONSE_CACHE_BYTES:
+            with _response_cache_lock:
+                _response_cache[key] = body
+    return Response(body, media_type="application/json")
+
+def clear_response_cache() -> None:
+    with _response_cache_lock:
+        _response_cache.clear()
+
+# Product pages larger than this are streamed row by row instead of being
+# built and cached in full.
+STREAM_MIN_LIMIT = 1000
+
+def stream_products_json(skip: int, limit: int, category_id: Optional[int], after_id: Optional[int]):
+    """Yield a JSON array of products as rows come off the cursor.
+
+    The generator keeps running after the endpoint returns, so it uses its
+    own session rather than the request's.
+    """
+    db = SessionLocal()
+    try:
+        yield b"["
+        for i, row in enumerate(crud.iter_products(db, skip, limit, category_id, after_id)):
+            body = PRODUCT_ADAPTER.dump_json(PRODUCT_ADAPTER.validate_python(row))
+            yield (b"," if i else b"") + body
+        yield b"]"
+    finally:
+        db.close()
+
+# Tokens are signed with this key, so it has to stay private; it comes from
+# the environment and the app refuses to start without it.
+SECRET_KEY = os.environ["SECRET_KEY"]
+ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
-
-# Simple token storage (in production, use Redis or database)
-active_tokens = {}
+ACCESS_TOKEN_TTL = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    """Create simple access token."""
-    user_id = data.get("sub")
-    token = f"token_{user_id}_{datetime.utcnow().timestamp()}"
-    active_tokens[token] = {"user_id": int(user_id), "expires": datetime.utcnow() + timedelta(minutes=30)}
-    return token
+    """Create a signed HS256 access token.
+
+    ``data`` must carry ``sub``; ``type`` defaults to ``"user"`` and is set to
+    ``"admin"`` for admin logins.
+    """
+    expire = datetime.now(timezone.utc) + (expires_delta or ACCESS_TOKEN_TTL)
+    payload = {"type": "user", **data, "exp": expire}
+    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+
+# Decoded payloads of recently seen tokens, so clients that call repeatedly
+# skip the base64 decode and HMAC check. Only valid tokens are stored, and
+# "exp" is still checked on every hit.
+_verified_tokens = TTLCache(maxsize=10_000, ttl=60)
+_verified_tokens_lock = Lock()
 
 def verify_token(token: str) -> Optional[dict]:
-    """Verify token and return token data."""
-    if token in active_tokens:
-        token_data = active_tokens[token]
-        if datetime.utcnow() < token_data["expires"]:
-            return token_data
-        else:
-            # Token expired, remove it
-            del active_tokens[token]
-    return None
-
-def get_current_user_id(token: str = Header(None)) -> int:
-    """Get current user ID from token in Authorization header."""
-    if not token or not token.startswith("Bearer "):
+    """Verify token signature and expiry and return its payload."""
+    with _verified_tokens_lock:
+        payload = _verified_tokens.get(token)
+    if payload is not None:
+        return payload if payload["exp"] > time.time() else None
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except jwt.InvalidTokenError:
+        # Also covers ExpiredSignatureError.
+        return None
+    with _verified_tokens_lock:
+        _verified_tokens[token] = payload
+    return payload
+
+def bearer_credentials(token: Optional[str]) -> str:
+    """Return the credentials from a ``Bearer <token>`` header value."""
+    credentials = token.removeprefix("Bearer ") if token else ""
+    if not credentials or len(credentials) == len(token):
         raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
-    token = token.split(" ")[1]
-    token_data = verify_token(token)
-    if token_data is None:
+    return credentials
+
+async def get_current_user_id(token: str = Header(None)) -> int:
+    """Get current user ID from token in Authorization header."""
+    token_data = verify_token(bearer_credentials(token))
+    if token_data is None or token_data.get("type") != "user":
         raise HTTPException(status_code=401, detail="Invalid or expired token")
-    return token_data["user_id"]
+    return int(token_data["sub"])
 
-def get_current_admin(token: str = Header(
+async def get_current_admin(token: str = Header(
         ...,  # required
         description="Authorization header. Example: Bearer <token>"
-    ), db: Session = Depends(get_db)) -> models.Admin:
-    """Get current admin from token in Authorization header."""
-    print(token)
-    if not token or not token.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
-    token = token.split(" ")[1]
-    token_data = verify_token(token)
-    if token_data is None:
+    ), db: Session = Depends(get_db)) -> Row:
+    """Get current admin from token in Authorization header.
+
+    Returns the cached ``(admin_id, role, is_active)`` row from
+    crud.get_admin_auth, not a models.Admin instance.
+    """
+    token_data = verify_token(bearer_credentials(token))
+    if token_data is None or token_data.get("type") != "admin":
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
     # Get admin by admin_id from token
-    admin_id = token_data["user_id"]  # In our case, user_id in token is actually admin_id for admin tokens
-    admin = crud.get_admin(db, admin_id)
+    admin_id = int(token_data["sub"])
+    # Token checks and cache hits run on the event loop; only a miss touches
+    # the database, so only that goes to the threadpool.
+    admin = crud.peek_admin_auth(admin_id)
+    if admin is None:
+        admin = await run_in_threadpool(crud.get_admin_auth, db, admin_id)
     if not admin or not admin.is_active:
         raise HTTPException(status_code=403, detail="Admin access required")
     return admin
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Size the worker threads and pre-open pooled connections before serving traffic."""
+    # Sync endpoints run on anyio worker threads (40 by default). Give them as
+    # many threads as there are pooled connections so a larger DB pool is not
+    # left idle behind a full threadpool.
+    to_thread.current_default_thread_limiter().total_tokens = POOL_SIZE + MAX_OVERFLOW
+    await run_in_threadpool(warm_pool)
+    yield
+
 app = FastAPI(
     title="E-Commerce Platform API",
     description="A comprehensive e-commerce platform built with FastAPI, SQLAlchemy, and PostgreSQL",
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # Root endpoint
-@app.get("/", response_model=dict)
-def read_root():
+@app.get("/")
+async def read_root():
     """Welcome message."""
-    return {
-        "message": "Welcome to E-Commerce Platform API",
-        "description": "A comprehensive e-commerce platform built with FastAPI, SQLAlchemy, and PostgreSQL",
-        "version": "1.0.0",
-        "docs": "/docs",
-        "redoc": "/redoc"
-    }
+    return Response(ROOT_BODY, media_type="application/json")
 
 # Health check endpoint
-@app.get("/health", response_model=dict)
-def health_check():
+@app.get("/health")
+async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "message": "E-Commerce API is running"}
+    return Response(HEALTH_BODY, media_type="application/json")
 
 @app.get("/test-auth")
-def test_auth_endpoint():
+async def test_auth_endpoint():
     """Test authentication endpoint."""
     try:
         # Test JWT creation
@@ -114,20 +205,21 @@ def test_auth_endpoint():
 @app.post("/admins/", response_model=schemas.Admin, status_code=status.HTTP_201_CREATED)
 def create_admin(admin: schemas.AdminCreate, db: Session = Depends(get_db)):
     try:
-        # Check for existing username
-        existing_username = crud.get_admin_by_username(db, admin.username)
-        if existing_username:
+        # One lookup for both unique columns, done before the password is hashed
+        conflict = crud.get_admin_conflict(db, admin.username, admin.email)
+        if conflict == "username":
             raise HTTPException(status_code=400, detail="Username already exists")
-        
-        # Check for existing email
-        existing_email = db.query(models.Admin).filter(models.Admin.email == admin.email).first()
-        if existing_email:
+        if conflict == "email":
             raise HTTPException(status_code=400, detail="Email already exists")
         
         return crud.create_admin(db=db, admin=admin)
     except HTTPException:
         # Re-raise HTTP exceptions (like duplicate username/email)
         raise
+    except IntegrityError:
+        # A concurrent signup took the username or email after the check
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Username or email already exists")
     except Exception as e:
         # Handle any other database errors
         db.rollback()
@@ -168,15 +260,14 @@ def delete_admin(admin_id: int, db: Session = Depends(get_db)):
 def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
     """Create a new user with proper password hashing."""
     try:
-        db_user = crud.get_user_by_email(db, email=user.email)
-        if db_user:
-            raise HTTPException(
-                status_code=400,
-                detail="Email already registered"
-            )
+        # The unique index on users.email rejects duplicates atomically.
         return crud.create_user(db=db, user=user)
-    except HTTPException:
-        raise
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Email already registered"
+        )
     except Exception as e:
         logger.error(f"Error creating user: {e}")
         raise HTTPException(
@@ -191,24 +282,22 @@ class LoginRequest(BaseModel):
 @app.post("/auth/login")
 def login_user(login_data: LoginRequest, db: Session = Depends(get_db)):
     """Login user and return JWT token."""
-    user = crud.get_user_by_email(db, email=login_data.email)
+    user = crud.get_user_by_email(db, email=login_data.username)
     if not user:
+        crud.burn_password_check(login_data.password)
         raise HTTPException(
             status_code=401,
-            detail="User not found"
+            detail="Invalid credentials"
         )
     
     # Verify password with proper hashing
     if not crud.verify_password(login_data.password, user.password_hash):
         raise HTTPException(
             status_code=401,
-            detail="Invalid password"
+            detail="Invalid credentials"
         )
     
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": str(user.user_id)}, expires_delta=access_token_expires
-    )
+    access_token = create_access_token(data={"sub": str(user.user_id)})
     return {"access_token": access_token, "token_type": "bearer", "user_id": user.user_id}
 
 @app.post("/auth/admin-login")
@@ -216,29 +305,27 @@ def login_admin(login_data: LoginRequest, db: Session = Depends(get_db)):
     """Login admin and return JWT token."""
     admin = crud.get_admin_by_username(db, username=login_data.username)  # Using email field as username for login
     if not admin:
+        crud.burn_password_check(login_data.password)
         raise HTTPException(
             status_code=401,
-            detail="Admin not found"
+            detail="Invalid credentials"
         )
     
     # Verify password with proper hashing
     if not crud.verify_password(login_data.password, admin.password_hash):
         raise HTTPException(
             status_code=401,
-            detail="Invalid password"
+            detail="Invalid credentials"
         )
     
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": str(admin.admin_id)}, expires_delta=access_token_expires
-    )
+    access_token = create_access_token(data={"sub": str(admin.admin_id), "type": "admin"})
     return {"access_token": access_token, "token_type": "bearer", "admin_id": admin.admin_id, "role": admin.role}
 
 @app.get("/users/", response_model=List[schemas.User])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_users(skip: int = 0, limit: int = 100, after_id: Optional[int] = None, db: Session = Depends(get_db)):
     """Get all users with pagination."""
-    users = crud.get_users(db, skip=skip, limit=limit)
-    return users
+    users = crud.get_users(db, skip=skip, limit=limit, after_id=after_id)
+    return json_list_response(USER_LIST_ADAPTER, users)
 
 @app.get("/users/{user_id}", response_model=schemas.User)
 def read_user(user_id: int, db: Session = Depends(get_db)):
@@ -269,37 +356,54 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
 @app.post("/categories/", response_model=schemas.Category, status_code=status.HTTP_201_CREATED)
 def create_category(category: schemas.CategoryCreate, db: Session = Depends(get_db)):
     """Create a new category."""
-    return crud.create_category(db=db, category=category)
+    db_category = crud.create_category(db=db, category=category)
+    clear_response_cache()
+    return db_category
 
 @app.get("/categories/", response_model=List[schemas.Category])
 def read_categories(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     """Get all categories."""
-    return crud.get_categories(db, skip=skip, limit=limit)
+    return cached_json_response(
+        ("categories", skip, limit), CATEGORY_LIST_ADAPTER,
+        lambda: crud.get_categories(db, skip=skip, limit=limit)
+    )
 
 @app.get("/categories/{category_id}", response_model=schemas.Category)
 def read_category(category_id: int, db: Session = Depends(get_db)):
     """Get a specific category by ID."""
-    db_category = crud.get_category(db, category_id=category_id)
-    if db_category is None:
-        raise HTTPException(status_code=404, detail="Category not found")
-    return db_category
+    def load():
+        db_category = crud.get_category(db, category_id=category_id)
+        if db_category is None:
+            raise HTTPException(status_code=404, detail="Category not found")
+        return db_category
+    return cached_json_response(("category", category_id), CATEGORY_ADAPTER, load)
 
 # ==================== PRODUCT ENDPOINTS ====================
 
 @app.post("/products/", response_model=schemas.Product, status_code=status.HTTP_201_CREATED)
 def create_product(product: schemas.ProductCreate, db: Session = Depends(get_db)):
     """Create a new product."""
-    return crud.create_product(db=db, product=product)
+    db_product = crud.create_product(db=db, product=product)
+    clear_response_cache()
+    return db_product
 
 @app.get("/products/", response_model=List[schemas.Product])
 def read_products(
     skip: int = 0, 
     limit: int = 100, 
     category_id: Optional[int] = None,
+    after_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
     """Get all products with optional category filter."""
-    return crud.get_products(db, skip=skip, limit=limit, category_id=category_id)
+    if limit > STREAM_MIN_LIMIT:
+        return StreamingResponse(
+            stream_products_json(skip, limit, category_id, after_id), media_type="application/json"
+        )
+    return cached_json_response(
+        ("products", skip, limit, category_id, after_id), PRODUCT_LIST_ADAPTER,
+        lambda: crud.get_products(db, skip=skip, limit=limit, category_id=category_id, after_id=after_id)
+    )
 
 @app.get("/products/search/", response_model=List[schemas.Product])
 def search_products(
@@ -314,10 +418,12 @@ def search_products(
 @app.get("/products/{product_id}", response_model=schemas.Product)
 def read_product(product_id: int, db: Session = Depends(get_db)):
     """Get a specific product by ID."""
-    db_product = crud.get_product(db, product_id=product_id)
-    if db_product is None:
-        raise HTTPException(status_code=404, detail="Product not found")
-    return db_product
+    def load():
+        db_product = crud.get_product(db, product_id=product_id)
+        if db_product is None:
+            raise HTTPException(status_code=404, detail="Product not found")
+        return db_product
+    return cached_json_response(("product", product_id), PRODUCT_ADAPTER, load)
 
 # ==================== INVENTORY ENDPOINTS ====================
 
@@ -326,6 +432,7 @@ def set_inventory(product_id: int, new_stock: int = 0, db: Session = Depends(get
     product = crud.set_product_stock(db, product_id, new_stock)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
+    clear_response_cache()
     return product
 
 
@@ -334,23 +441,26 @@ def increment_inventory(product_id: int, delta: int = 0, db: Session = Depends(g
     product = crud.increment_product_stock(db, product_id, delta)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
+    clear_response_cache()
     return product
 
 # ==================== ADMIN ENDPOINTS ====================
 
 # Admin Product Management
 @app.get("/admin/products/", response_model=List[schemas.Product])
-def admin_get_products(skip: int = 0, limit: int = 100, admin: models.Admin = Depends(get_current_admin), db: Session = Depends(get_db)):
+def admin_get_products(skip: int = 0, limit: int = 100, after_id: Optional[int] = None, admin: Row = Depends(get_current_admin), db: Session = Depends(get_db)):
     """Get all products. Admin only."""
-    return crud.get_products(db, skip=skip, limit=limit)
+    return crud.get_products(db, skip=skip, limit=limit, after_id=after_id)
 
 @app.post("/admin/products/", response_model=schemas.Product, status_code=status.HTTP_201_CREATED)
-def admin_create_product(product: schemas.ProductCreate, admin: models.Admin = Depends(get_current_admin), db: Session = Depends(get_db)):
+def admin_create_product(product: schemas.ProductCreate, admin: Row = Depends(get_current_admin), db: Session = Depends(get_db)):
     """Create a new product. Admin only."""
-    return crud.create_product(db=db, product=product)
+    db_product = crud.create_product(db=db, product=product)
+    clear_response_cache()
+    return db_product
 
 @app.get("/admin/products/{product_id}", response_model=schemas.Product)
-def admin_get_product(product_id: int, admin: models.Admin = Depends(get_current_admin), db: Session = Depends(get_db)):
+def admin_get_product(product_id: int, admin: Row = Depends(get_current_admin), db: Session = Depends(get_db)):
     """Get a specific product by ID. Admin only."""
     db_product = crud.get_product(db, product_id=product_id)
     if db_product is None:
@@ -358,87 +468,87 @@ def admin_get_product(product_id: int, admin: models.Admin = Depends(get_current
     return db_product
 
 @app.put("/admin/products/{product_id}", response_model=schemas.Product)
-def admin_update_product(product_id: int, product_update: schemas.ProductUpdate, admin: models.Admin = Depends(get_current_admin), db: Session = Depends(get_db)):
+def admin_update_product(product_id: int, product_update: schemas.ProductUpdate, admin: Row = Depends(get_current_admin), db: Session = Depends(get_db)):
     """Update a product. Admin only."""
     db_product = crud.update_product(db, product_id, product_update)
     if not db_product:
         raise HTTPException(status_code=404, detail="Product not found")
+    clear_response_cache()
     return db_product
 
 @app.delete("/admin/products/{product_id}")
-def admin_delete_product(product_id: int, admin: models.Admin = Depends(get_current_admin), db: Session = Depends(get_db)):
+def admin_delete_product(product_id: int, admin: Row = Depends(get_current_admin), db: Session = Depends(get_db)):
     """Delete a product. Admin only."""
     success = crud.delete_product(db, product_id)
     if not success:
         raise HTTPException(status_code=404, detail="Product not found")
+    clear_response_cache()
     return {"message": "Product deleted successfully"}
 
 # Admin Inventory Management
 @app.post("/admin/inventory/{product_id}/set", response_model=schemas.Product)
-def admin_set_inventory(product_id: int, new_stock: int = 0, admin: models.Admin = Depends(get_current_admin), db: Session = Depends(get_db)):
+def admin_set_inventory(product_id: int, new_stock: int = 0, admin: Row = Depends(get_current_admin), db: Session = Depends(get_db)):
     """Set product stock. Admin only."""
     product = crud.set_product_stock(db, product_id, new_stock)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
+    clear_response_cache()
     return product
 
 @app.post("/admin/inventory/{product_id}/increment", response_model=schemas.Product)
-def admin_increment_inventory(product_id: int, delta: int = 0, admin: models.Admin = Depends(get_current_admin), db: Session = Depends(get_db)):
+def admin_increment_inventory(product_id: int, delta: int = 0, admin: Row = Depends(get_current_admin), db: Session = Depends(get_db)):
     """Increment product stock. Admin only."""
     product = crud.increment_product_stock(db, product_id, delta)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
+    clear_response_cache()
     return product
 
 # Admin User Management
 @app.get("/admin/users/", response_model=List[schemas.User])
-def admin_get_users(skip: int = 0, limit: int = 100, admin: models.Admin = Depends(get_current_admin), db: Session = Depends(get_db)):
+def admin_get_users(skip: int = 0, limit: int = 100, after_id: Optional[int] = None, admin: Row = Depends(get_current_admin), db: Session = Depends(get_db)):
     """Get all users. Admin only."""
-    return crud.get_users(db, skip=skip, limit=limit)
+    return json_list_response(USER_LIST_ADAPTER, crud.get_users(db, skip=skip, limit=limit, after_id=after_id))
 
 @app.delete("/admin/users/{user_id}")
-def admin_delete_user(user_id: int, admin: models.Admin = Depends(get_current_admin), db: Session = Depends(get_db)):
+def admin_delete_user(user_id: int, admin: Row = Depends(get_current_admin), db: Session = Depends(get_db)):
     """Delete a user. Admin only."""
-    success = crud.delete_user(db, user_id)
+    success = crud.hard_delete_user(db, user_id)
     if not success:
         raise HTTPException(status_code=404, detail="User not found")
     return {"message": "User deleted successfully"}
 
 @app.put("/admin/users/{user_id}/status")
-def admin_update_user_status(user_id: int, is_active: bool, admin: models.Admin = Depends(get_current_admin), db: Session = Depends(get_db)):
+def admin_update_user_status(user_id: int, is_active: bool, admin: Row = Depends(get_current_admin), db: Session = Depends(get_db)):
     """Update user active status. Admin only."""
-    user = crud.get_user(db, user_id)
+    user = crud.set_user_active(db, user_id, is_active)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    user.is_active = is_active
-    db.commit()
-    db.refresh(user)
     return {"message": f"User {'activated' if is_active else 'deactivated'} successfully"}
 
 # Admin Review Management
 @app.get("/admin/reviews/", response_model=List[schemas.Review])
-def admin_get_reviews(skip: int = 0, limit: int = 100, admin: models.Admin = Depends(get_current_admin), db: Session = Depends(get_db)):
+def admin_get_reviews(skip: int = 0, limit: int = 100, admin: Row = Depends(get_current_admin), db: Session = Depends(get_db)):
     """Get all reviews. Admin only."""
-    return crud.get_reviews(db, skip=skip, limit=limit)
+    return json_list_response(REVIEW_LIST_ADAPTER, crud.get_reviews(db, skip=skip, limit=limit))
 
 @app.delete("/admin/reviews/{review_id}")
-def admin_delete_review(review_id: int, admin: models.Admin = Depends(get_current_admin), db: Session = Depends(get_db)):
+def admin_delete_review(review_id: int, admin: Row = Depends(get_current_admin), db: Session = Depends(get_db)):
     """Delete a review. Admin only."""
     success = crud.delete_review(db, review_id)
     if not success:
         raise HTTPException(status_code=404, detail="Review not found")
+    clear_response_cache()
     return {"message": "Review deleted successfully"}
 
 # Admin Pricing Management
 @app.put("/admin/pricing/{product_id}")
-def admin_update_product_price(product_id: int, new_price: float, admin: models.Admin = Depends(get_current_admin), db: Session = Depends(get_db)):
+def admin_update_product_price(product_id: int, new_price: float, admin: Row = Depends(get_current_admin), db: Session = Depends(get_db)):
     """Update product price. Admin only."""
-    product = crud.get_product(db, product_id)
+    product = crud.set_product_price(db, product_id, new_price)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
-    product.price = new_price
-    db.commit()
-    db.refresh(product)
+    clear_response_cache()
     return {"message": f"Product price updated to ${new_price}", "product": product}
 
 # ==================== CART ENDPOINTS ====================
@@ -448,26 +558,46 @@ def get_user_cart(user_id: int, current_user_id: int = Depends(get_current_user_
     """Get user's cart. Requires authentication."""
     if current_user_id != user_id:
         raise HTTPException(status_code=403, detail="Not authorized to access this cart")
-    cart = crud.get_or_create_cart(db, user_id=user_id)
-    return cart
+    return crud.get_user_cart(db, user_id=user_id)
 
 @app.post("/cart/items/", response_model=schemas.CartItem, status_code=status.HTTP_201_CREATED)
 def add_to_cart(cart_item: schemas.CartItemCreate, current_user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
     """Add a product to cart. Requires authentication."""
-    # Verify the cart belongs to the authenticated user
-    cart = crud.get_cart(db, cart_item.cart_id)
-    if not cart or cart.user_id != current_user_id:
+    # Only inserts when the cart belongs to the authenticated user
+    db_cart_item = crud.add_to_cart(db=db, cart_item=cart_item, user_id=current_user_id)
+    if db_cart_item is None:
         raise HTTPException(status_code=403, detail="Not authorized to add items to this cart")
-    return crud.add_to_cart(db=db, cart_item=cart_item)
+    return db_cart_item
+
+@app.post("/cart/items/bulk", response_model=List[schemas.CartItem], status_code=status.HTTP_201_CREATED)
+def add_to_cart_bulk(cart_items: List[schemas.CartItemCreate], current_user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
+    """Add several products to cart in one request. Requires authentication."""
+    requested = {}
+    for item in cart_items:
+        requested[item.product_id] = requested.get(item.product_id, 0) + item.quantity
+    products = crud.get_products_by_ids(db, requested)
+    missing = requested.keys() - products.keys()
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Products not found: {sorted(missing)}")
+    inactive = sorted(pid for pid, product in products.items() if not product.is_active)
+    if inactive:
+        raise HTTPException(status_code=400, detail=f"Products not available: {inactive}")
+    short = sorted(pid for pid, quantity in requested.items() if quantity > products[pid].stock_qty)
+    if short:
+        raise HTTPException(status_code=409, detail=f"Insufficient stock for products: {short}")
+    db_cart_items = crud.add_to_cart_bulk(db=db, cart_items=cart_items, user_id=current_user_id)
+    if db_cart_items is None:
+        raise HTTPException(status_code=403, detail="Not authorized to add items to this cart")
+    return db_cart_items
 
 @app.get("/cart/{cart_id}/items/", response_model=List[schemas.CartItem])
 def get_cart_items(cart_id: int, current_user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
     """Get all items in a cart. Requires authentication."""
-    # Verify the cart belongs to the authenticated user
-    cart = crud.get_cart(db, cart_id)
-    if not cart or cart.user_id != current_user_id:
+    # Ownership is checked in the same query that reads the items
+    items = crud.get_cart_items(db, cart_id=cart_id, user_id=current_user_id)
+    if items is None:
         raise HTTPException(status_code=403, detail="Not authorized to access this cart")
-    return crud.get_cart_items(db, cart_id=cart_id)
+    return items
 
 # ==================== ORDER ENDPOINTS ====================
 
@@ -481,7 +611,7 @@ def create_order(order: schemas.OrderCreate, current_user_id: int = Depends(get_
 @app.get("/orders/", response_model=List[schemas.Order])
 def read_orders(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     """Get all orders. (Admin only - no auth for now)"""
-    return crud.get_orders(db, skip=skip, limit=limit)
+    return json_list_response(ORDER_LIST_ADAPTER, crud.get_orders(db, skip=skip, limit=limit))
 
 @app.get("/orders/{order_id}", response_model=schemas.Order)
 def read_order(order_id: int, current_user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
@@ -494,31 +624,31 @@ def read_order(order_id: int, current_user_id: int = Depends(get_current_user_id
     return db_order
 
 @app.get("/users/{user_id}/orders/", response_model=List[schemas.Order])
-def read_user_orders(user_id: int, current_user_id: int = Depends(get_current_user_id), skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get orders by user ID. Requires authentication."""
+def read_user_orders(user_id: int, current_user_id: int = Depends(get_current_user_id), skip: int = 0, limit: int = 100, before_id: Optional[int] = None, db: Session = Depends(get_db)):
+    """Get orders by user ID, newest first. Requires authentication."""
     if user_id != current_user_id:
         raise HTTPException(status_code=403, detail="Not authorized to access this user's orders")
-    return crud.get_orders_by_user(db, user_id=user_id, skip=skip, limit=limit)
+    return crud.get_orders_by_user(db, user_id=user_id, skip=skip, limit=limit, before_id=before_id)
 
 # ==================== ORDER ITEM ENDPOINTS ====================
 
 @app.post("/order-items/", response_model=schemas.OrderItem, status_code=status.HTTP_201_CREATED)
 def create_order_item(order_item: schemas.OrderItemCreate, current_user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
     """Create a new order item. Requires authentication."""
-    # Verify the order belongs to the authenticated user
-    order = crud.get_order(db, order_item.order_id)
-    if not order or order.user_id != current_user_id:
+    # Only inserts when the order belongs to the authenticated user
+    db_order_item = crud.create_order_item(db=db, order_item=order_item, user_id=current_user_id)
+    if db_order_item is None:
         raise HTTPException(status_code=403, detail="Not authorized to add items to this order")
-    return crud.create_order_item(db=db, order_item=order_item)
+    return db_order_item
 
 @app.get("/orders/{order_id}/items/", response_model=List[schemas.OrderItem])
 def get_order_items(order_id: int, current_user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)):
     """Get all items in an order. Requires authentication."""
-    # Verify the order belongs to the authenticated user
-    order = crud.get_order(db, order_id)
-    if not order or order.user_id != current_user_id:
+    # Ownership is checked in the same query that reads the items
+    items = crud.get_order_items(db, order_id=order_id, user_id=current_user_id)
+    if items is None:
         raise HTTPException(status_code=403, detail="Not authorized to access this order's items")
-    return crud.get_order_items(db, order_id=order_id)
+    return items
 
 # ==================== PAYMENT ENDPOINTS ====================
 
@@ -540,7 +670,9 @@ def read_payment(payment_id: int, db: Session = Depends(get_db)):
 @app.post("/reviews/", response_model=schemas.Review, status_code=status.HTTP_201_CREATED)
 def create_review(review: schemas.ReviewCreate, db: Session = Depends(get_db)):
     """Create a new review."""
-    return crud.create_review(db=db, review=review)
+    db_review = crud.create_review(db=db, review=review)
+    clear_response_cache()
+    return db_review
 
 @app.get("/reviews/{review_id}", response_model=schemas.Review)
 def read_review(review_id: int, db: Session = Depends(get_db)):
@@ -553,7 +685,10 @@ def read_review(review_id: int, db: Session = Depends(get_db)):
 @app.get("/products/{product_id}/reviews/", response_model=List[schemas.Review])
 def read_product_reviews(product_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     """Get reviews for a specific product."""
-    return crud.get_reviews_by_product(db, product_id=product_id, skip=skip, limit=limit)
+    return cached_json_response(
+        ("product_reviews", product_id, skip, limit), REVIEW_LIST_ADAPTER,
+        lambda: crud.get_reviews_by_product(db, product_id=product_id, skip=skip, limit=limit)
+    )
 
 # ==================== SHIPPING ENDPOINTS ====================
 
@@ -571,50 +706,30 @@ def read_shipping(shipment_id: int, db: Session = Depends(get_db)):
     return db_shipping
 
 # ==================== STATISTICS ENDPOINTS ====================
+# Not in the response cache: crud reuses each result for five seconds per
+# worker, so counts are at most five seconds old.
 
 @app.get("/stats/products")
 def get_product_stats(db: Session = Depends(get_db)):
     """Get product statistics."""
-    total_products = db.query(models.Product).count()
-    active_products = db.query(models.Product).filter(models.Product.is_active == True).count()
-    low_stock_products = db.query(models.Product).filter(models.Product.stock_qty < 10).count()
-    
-    return {
-        "total_products": total_products,
-        "active_products": active_products,
-        "low_stock_products": low_stock_products
-    }
+    return crud.get_product_stats(db)._asdict()
 
 @app.get("/stats/users")
 def get_user_stats(db: Session = Depends(get_db)):
     """Get user statistics."""
-    total_users = db.query(models.User).count()
-    active_users = db.query(models.User).filter(models.User.is_active == True).count()
-    
-    return {
-        "total_users": total_users,
-        "active_users": active_users
-    }
+    return crud.get_user_stats(db)._asdict()
 
 @app.get("/stats/orders")
 def get_order_stats(db: Session = Depends(get_db)):
     """Get order statistics."""
-    total_orders = db.query(models.Order).count()
-    pending_orders = db.query(models.Order).filter(models.Order.status == "pending").count()
-    completed_orders = db.query(models.Order).filter(models.Order.status == "completed").count()
-    
-    return {
-        "total_orders": total_orders,
-        "pending_orders": pending_orders,
-        "completed_orders": completed_orders
-    }
+    return crud.get_order_stats(db)._asdict()
 
 # Error handlers
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
-    return JSONResponse(status_code=404, content={"detail": "Resource not found"})
+    return ORJSONResponse(status_code=404, content={"detail": "Resource not found"})
 
 @app.exception_handler(500)
 async def internal_error_handler(request, exc):
     logger.error(f"Internal server error: {exc}")
-    return JSONResponse(status_code=500, content={"detail": "Internal server error"})
\ No newline at end of file
+    return ORJSONResponse(status_code=500, content={"detail": "Internal server error"})
\ No newline at end of file
@@ -1,14 +1,17 @@
 """SQLAlchemy database models for E-Commerce Platform."""
 
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Boolean, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, DateTime, Boolean, Text, UniqueConstraint, Index, Computed, func, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from app.database import Base
 
 
 class User(Base):
     """Registered users/customers."""
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_active", "user_id", postgresql_where=text("is_active")),
+    )
 
     user_id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
@@ -16,7 +19,7 @@ class User(Base):
     password_hash = Column(String(255), nullable=False)
     phone = Column(String(20), nullable=True)
     address = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
 
     # Relationships
@@ -32,7 +35,7 @@ class Category(Base):
     category_id = Column(Integer, primary_key=True, index=True)
     category_name = Column(String(100), nullable=False, unique=True)
     description = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
     products = relationship("Product", back_populates="category", cascade="all, delete-orphan")
@@ -41,19 +44,37 @@ class Category(Base):
 class Product(Base):
     """Items listed for sale."""
     __tablename__ = "products"
+    __table_args__ = (
+        # Trigram indexes let the leading-wildcard ILIKE in search_products
+        # use an index instead of scanning the whole table.
+        Index("products_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("products_description_trgm", "description", postgresql_using="gin", postgresql_ops={"description": "gin_trgm_ops"}),
+        Index("products_search_gin", "search_tsv", postgresql_using="gin"),
+        Index("ix_products_low_stock", "product_id", postgresql_where=text("stock_qty < 10")),
+        Index("ix_products_active", "product_id", postgresql_where=text("is_active")),
+        # Serves get_products' category filter and its product_id ordering
+        # and keyset, so category pages are read in index order.
+        Index("ix_products_category_id_product_id", "category_id", "product_id"),
+    )
 
     product_id = Column(Integer, primary_key=True, index=True)
     name = Column(String(200), nullable=False, index=True)
     description = Column(Text, nullable=True)
-    price = Column(Float, nullable=False)
+    price = Column(Numeric(12, 2), nullable=False)
     stock_qty = Column(Integer, default=0, nullable=False)
     category_id = Column(Integer, ForeignKey("categories.category_id"), nullable=True)
     brand = Column(String(100), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
+    # Maintained by Postgres for multi-word search; deferred so regular
+    # product loads never ship it.
+    search_tsv = deferred(Column(
+        TSVECTOR,
+        Computed("to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, ''))", persisted=True),
+    ))
 
     # Relationships
-    category = relationship("Category", back_populates="products")
+    category = relationship("Category", back_populates="products", lazy="raise")
     cart_items = relationship("CartItem", back_populates="product", cascade="all, delete-orphan")
     order_items = relationship("OrderItem", back_populates="product", cascade="all, delete-orphan")
     reviews = relationship("Review", back_populates="product", cascade="all, delete-orphan")
@@ -62,14 +83,18 @@ class Product(Base):
 class Order(Base):
     """Customer orders."""
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_status", "status"),
+        Index("ix_orders_user_id_order_id", "user_id", text("order_id DESC")),
+    )
 
     order_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
-    order_date = Column(DateTime, default=datetime.utcnow, nullable=False)
+    order_date = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     status = Column(String(50), default="pending", nullable=False)
-    total_amount = Column(Float, nullable=False)
+    total_amount = Column(Numeric(12, 2), nullable=False)
     shipping_address = Column(Text, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="orders")
@@ -86,22 +111,26 @@ class OrderItem(Base):
     order_id = Column(Integer, ForeignKey("orders.order_id"), nullable=False)
     product_id = Column(Integer, ForeignKey("products.product_id"), nullable=False)
     quantity = Column(Integer, nullable=False)
-    unit_price = Column(Float, nullable=False)
-    subtotal = Column(Float, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    unit_price = Column(Numeric(12, 2), nullable=False)
+    # Maintained by PostgreSQL, so it can never drift from quantity * unit_price.
+    subtotal = Column(Numeric(12, 2), Computed("quantity * unit_price", persisted=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
     order = relationship("Order", back_populates="order_items")
-    product = relationship("Product", back_populates="order_items")
+    product = relationship("Product", back_populates="order_items", lazy="raise")
 
 
 class Cart(Base):
     """User's shopping cart."""
     __tablename__ = "carts"
+    __table_args__ = (
+        Index("uq_carts_user_id", "user_id", unique=True, postgresql_include=["cart_id", "created_at"]),
+    )
 
     cart_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="carts")
@@ -111,16 +140,19 @@ class Cart(Base):
 class CartItem(Base):
     """Products added to a cart."""
     __tablename__ = "cart_items"
+    __table_args__ = (
+        UniqueConstraint("cart_id", "product_id", name="uq_cart_items_cart_product"),
+    )
 
     cart_item_id = Column(Integer, primary_key=True, index=True)
     cart_id = Column(Integer, ForeignKey("carts.cart_id"), nullable=False)
     product_id = Column(Integer, ForeignKey("products.product_id"), nullable=False)
     quantity = Column(Integer, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
     cart = relationship("Cart", back_populates="cart_items")
-    product = relationship("Product", back_populates="cart_items")
+    product = relationship("Product", back_populates="cart_items", lazy="raise")
 
 
 class Payment(Base):
@@ -130,10 +162,10 @@ class Payment(Base):
     payment_id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("orders.order_id"), nullable=False)
     payment_method = Column(String(50), nullable=False)
-    amount = Column(Float, nullable=False)
+    amount = Column(Numeric(12, 2), nullable=False)
     status = Column(String(50), default="pending", nullable=False)
     transaction_id = Column(String(100), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
     order = relationship("Order", back_populates="payment")
@@ -148,11 +180,11 @@ class Review(Base):
     product_id = Column(Integer, ForeignKey("products.product_id"), nullable=False)
     rating = Column(Integer, nullable=False)
     comment = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="reviews")
-    product = relationship("Product", back_populates="reviews")
+    product = relationship("Product", back_populates="reviews", lazy="raise")
 
 
 class Shipping(Base):
@@ -164,9 +196,9 @@ class Shipping(Base):
     courier_name = Column(String(100), nullable=False)
     tracking_number = Column(String(100), nullable=True)
     status = Column(String(50), default="pending", nullable=False)
-    estimated_delivery = Column(DateTime, nullable=True)
-    delivered_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    estimated_delivery = Column(DateTime(timezone=True), nullable=True)
+    delivered_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
     order = relationship("Order", back_populates="shipping")
@@ -182,4 +214,4 @@ class Admin(Base):
     password_hash = Column(String(255), nullable=False)
     role = Column(String(50), nullable=False, default="admin")
     is_active = Column(Boolean, default=True, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
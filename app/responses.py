@@ -0,0 +1,21 @@
+"""Prebuilt JSON responses shared by the full and simplified apps."""
+
+from fastapi.responses import Response
+import orjson
+from pydantic import TypeAdapter
+
+
+def json_list_response(adapter: TypeAdapter, rows) -> Response:
+    """Serialize ``rows`` with a prebuilt list adapter."""
+    return Response(adapter.dump_json(adapter.validate_python(rows)), media_type="application/json")
+
+
+# Constant payloads, rendered once; load balancers hit /health constantly.
+ROOT_BODY = orjson.dumps({
+    "message": "Welcome to E-Commerce Platform API",
+    "description": "A comprehensive e-commerce platform built with FastAPI, SQLAlchemy, and PostgreSQL",
+    "version": "1.0.0",
+    "docs": "/docs",
+    "redoc": "/redoc"
+})
+HEALTH_BODY = orjson.dumps({"status": "healthy", "message": "E-Commerce API is running"})
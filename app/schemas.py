@@ -1,25 +1,60 @@
 """Pydantic schemas for request and response validation."""
 
+import re
 from datetime import datetime
-from typing import Optional, List
-from pydantic import BaseModel, EmailStr
+from typing import Annotated, Optional, List
+from pydantic import AfterValidator, BaseModel, ConfigDict
+
+# Emails are checked with one precompiled pattern on the request models only;
+# response models take stored addresses as they are. The pattern is loose on
+# purpose so internationalised addresses (unicode local parts, IDN and
+# punycode domains) still pass.
+EMAIL_RE = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s.]+")
+# "Name <address>" is accepted and reduced to the address, as EmailStr did.
+NAMED_EMAIL_RE = re.compile(r"[^<>]*<\s*([^<>]*?)\s*>\s*")
+
+
+def _check_email(value: str) -> str:
+    named = NAMED_EMAIL_RE.fullmatch(value)
+    if named:
+        value = named.group(1)
+    if not EMAIL_RE.fullmatch(value):
+        raise ValueError("value is not a valid email address")
+    return value
+
+
+Email = Annotated[str, AfterValidator(_check_email)]
+
+# bcrypt only looks at the first 72 bytes of a password; longer ones are
+# rejected here so the client gets a 422 instead of a failed hash.
+MAX_PASSWORD_BYTES = 72
+
+
+def _check_password(value: str) -> str:
+    if len(value.encode()) > MAX_PASSWORD_BYTES:
+        raise ValueError(f"password must be at most {MAX_PASSWORD_BYTES} bytes long")
+    return value
+
+
+Password = Annotated[str, AfterValidator(_check_password)]
 
 
 # User Schemas
 class UserBase(BaseModel):
     name: str
-    email: EmailStr
+    email: str
     phone: Optional[str] = None
     address: Optional[str] = None
 
 
 class UserCreate(UserBase):
-    password: str
+    email: Email
+    password: Password
 
 
 class UserUpdate(BaseModel):
     name: Optional[str] = None
-    email: Optional[EmailStr] = None
+    email: Optional[Email] = None
     phone: Optional[str] = None
     address: Optional[str] = None
 
@@ -29,8 +64,7 @@ class User(UserBase):
     created_at: datetime
     is_active: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Category Schemas
@@ -52,8 +86,7 @@ class Category(CategoryBase):
     category_id: int
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Product Schemas
@@ -84,8 +117,7 @@ class Product(ProductBase):
     created_at: datetime
     is_active: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Order Schemas
@@ -111,8 +143,7 @@ class Order(OrderBase):
     status: str
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # OrderItem Schemas
@@ -121,7 +152,6 @@ class OrderItemBase(BaseModel):
     product_id: int
     quantity: int
     unit_price: float
-    subtotal: float
 
 
 class OrderItemCreate(OrderItemBase):
@@ -131,15 +161,14 @@ class OrderItemCreate(OrderItemBase):
 class OrderItemUpdate(BaseModel):
     quantity: Optional[int] = None
     unit_price: Optional[float] = None
-    subtotal: Optional[float] = None
 
 
 class OrderItem(OrderItemBase):
     order_item_id: int
+    subtotal: float
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Cart Schemas
@@ -155,8 +184,7 @@ class Cart(CartBase):
     cart_id: int
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # CartItem Schemas
@@ -178,8 +206,7 @@ class CartItem(CartItemBase):
     cart_item_id: int
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Payment Schemas
@@ -206,8 +233,7 @@ class Payment(PaymentBase):
     status: str
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Review Schemas
@@ -231,8 +257,7 @@ class Review(ReviewBase):
     review_id: int
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Shipping Schemas
@@ -261,33 +286,32 @@ class Shipping(ShippingBase):
     delivered_at: Optional[datetime] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 # Admin Schemas
 class AdminBase(BaseModel):
     username: str
-    email: EmailStr
+    email: str
     role: str = "admin"
     is_active: bool = True
 
 
 class AdminCreate(AdminBase):
-    password: str
+    email: Email
+    password: Password
 
 
 class AdminUpdate(BaseModel):
     username: Optional[str] = None
-    email: Optional[EmailStr] = None
+    email: Optional[Email] = None
     role: Optional[str] = None
     is_active: Optional[bool] = None
-    password: Optional[str] = None
+    password: Optional[Password] = None
 
 
 class Admin(AdminBase):
     admin_id: int
     created_at: datetime
 
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
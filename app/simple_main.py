@@ -1,63 +1,69 @@
 """Simplified FastAPI E-Commerce Platform Application."""
 
 from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse, Response
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import logging
+from pydantic import TypeAdapter
 
-from . import crud, models, schemas
+from . import crud, schemas
 from .database import get_db
+from .responses import HEALTH_BODY, ROOT_BODY, json_list_response
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# List endpoints validate rows and write JSON bytes through these adapters,
+# built once here; response_model is kept for the OpenAPI schema.
+USER_LIST_ADAPTER = TypeAdapter(List[schemas.User])
+PRODUCT_LIST_ADAPTER = TypeAdapter(List[schemas.Product])
+CART_ITEM_LIST_ADAPTER = TypeAdapter(List[schemas.CartItem])
+
 # Initialize FastAPI app
 app = FastAPI(
     title="E-Commerce Platform API",
     description="A comprehensive e-commerce platform built with FastAPI, SQLAlchemy, and PostgreSQL",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
 # Root endpoint
-@app.get("/", response_model=dict)
-def read_root():
+@app.get("/")
+async def read_root():
     """Welcome message."""
-    return {
-        "message": "Welcome to E-Commerce Platform API",
-        "description": "A comprehensive e-commerce platform built with FastAPI, SQLAlchemy, and PostgreSQL",
-        "version": "1.0.0",
-        "docs": "/docs",
-        "redoc": "/redoc"
-    }
+    return Response(ROOT_BODY, media_type="application/json")
 
 # Health check endpoint
-@app.get("/health", response_model=dict)
-def health_check():
+@app.get("/health")
+async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "message": "E-Commerce API is running"}
+    return Response(HEALTH_BODY, media_type="application/json")
 
 # ==================== USER ENDPOINTS ====================
 
 @app.post("/users/", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
 def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
     """Create a new user."""
-    db_user = crud.get_user_by_email(db, email=user.email)
-    if db_user:
+    try:
+        return crud.create_user(db=db, user=user)
+    except IntegrityError:
+        db.rollback()
         raise HTTPException(
             status_code=400,
             detail="Email already registered"
         )
-    return crud.create_user(db=db, user=user)
 
 
 @app.get("/users/", response_model=List[schemas.User])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_users(skip: int = 0, limit: int = 100, after_id: Optional[int] = None, db: Session = Depends(get_db)):
     """Get all users with pagination."""
-    users = crud.get_users(db, skip=skip, limit=limit)
-    return users
+    users = crud.get_users(db, skip=skip, limit=limit, after_id=after_id)
+    return json_list_response(USER_LIST_ADAPTER, users)
 
 
 @app.get("/users/{user_id}", response_model=schemas.User)
@@ -93,10 +99,12 @@ def read_products(
     skip: int = 0, 
     limit: int = 100, 
     category_id: Optional[int] = None,
+    after_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
     """Get all products with optional category filter."""
-    return crud.get_products(db, skip=skip, limit=limit, category_id=category_id)
+    products = crud.get_products(db, skip=skip, limit=limit, category_id=category_id, after_id=after_id)
+    return json_list_response(PRODUCT_LIST_ADAPTER, products)
 
 
 @app.get("/products/search/", response_model=List[schemas.Product])
@@ -107,7 +115,8 @@ def search_products(
     db: Session = Depends(get_db)
 ):
     """Search products by name or description."""
-    return crud.search_products(db, search_term=q, skip=skip, limit=limit)
+    products = crud.search_products(db, search_term=q, skip=skip, limit=limit)
+    return json_list_response(PRODUCT_LIST_ADAPTER, products)
 
 
 @app.get("/products/{product_id}", response_model=schemas.Product)
@@ -136,42 +145,28 @@ def add_to_cart(cart_item: schemas.CartItemCreate, db: Session = Depends(get_db)
 @app.get("/cart/{cart_id}/items/", response_model=List[schemas.CartItem])
 def get_cart_items(cart_id: int, db: Session = Depends(get_db)):
     """Get all items in a cart."""
-    return crud.get_cart_items(db, cart_id=cart_id)
+    return json_list_response(CART_ITEM_LIST_ADAPTER, crud.get_cart_items(db, cart_id=cart_id))
 
 # ==================== STATISTICS ENDPOINTS ====================
 
 @app.get("/stats/products")
 def get_product_stats(db: Session = Depends(get_db)):
     """Get product statistics."""
-    total_products = db.query(models.Product).count()
-    active_products = db.query(models.Product).filter(models.Product.is_active == True).count()
-    low_stock_products = db.query(models.Product).filter(models.Product.stock_qty < 10).count()
-    
-    return {
-        "total_products": total_products,
-        "active_products": active_products,
-        "low_stock_products": low_stock_products
-    }
+    return crud.get_product_stats(db)._asdict()
 
 
 @app.get("/stats/users")
 def get_user_stats(db: Session = Depends(get_db)):
     """Get user statistics."""
-    total_users = db.query(models.User).count()
-    active_users = db.query(models.User).filter(models.User.is_active == True).count()
-    
-    return {
-        "total_users": total_users,
-        "active_users": active_users
-    }
+    return crud.get_user_stats(db)._asdict()
 
 # Error handlers
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
-    return {"detail": "Resource not found"}
+    return ORJSONResponse(status_code=404, content={"detail": "Resource not found"})
 
 
 @app.exception_handler(500)
 async def internal_error_handler(request, exc):
     logger.error(f"Internal server error: {exc}")
-    return {"detail": "Internal server error"}
+    return ORJSONResponse(status_code=500, content={"detail": "Internal server error"})